@@ -0,0 +1,8 @@
+-- Upgrade existing installs to add the persisted poll state {{{
+
+CREATE TABLE IF NOT EXISTS stream_alert_polls(
+  appname TEXT PRIMARY KEY,
+  last_poll_at TIMESTAMPTZ
+);
+
+-- }}}
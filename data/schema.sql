@@ -1,5 +1,6 @@
 -- Stream Alerts {{{
 
+-- DROP TABLE IF EXISTS stream_alert_polls;
 -- DROP TABLE IF EXISTS stream_alerts;
 -- DROP TABLE IF EXISTS streams;
 -- DROP TABLE IF EXISTS alert_channels;
@@ -45,6 +46,11 @@ CREATE TABLE stream_alerts(
     resolved_at TIMESTAMPTZ
 );
 
+CREATE TABLE stream_alert_polls(
+  appname TEXT PRIMARY KEY,
+  last_poll_at TIMESTAMPTZ
+);
+
 
 -- }}}
 
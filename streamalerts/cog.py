@@ -1,4 +1,8 @@
 import asyncio
+import datetime as dt
+import random
+import time
+from collections import defaultdict
 from typing import Optional
 
 import discord
@@ -22,28 +26,71 @@ from .editor import AlertEditorUI
 
 class AlertCog(LionCog):
     POLL_PERIOD = 60
+    POLL_JITTER = 5
+    MAX_BACKOFF = 600
+    EVENT_BACKLOG = 200
+    EVENT_WORKERS = 4
+    PERMISSION_TTL = 30
+    FLAP_WINDOW = 180
+    EVENT_DRAIN_TIMEOUT = 30
 
     def __init__(self, bot: LionBot):
         self.bot = bot
+        self.POLL_PERIOD = bot.config.twitch.getint('poll_period', fallback=self.POLL_PERIOD)
         self.data = bot.db.load_registry(AlertsData())
         self.twitch = None
         self.alert_settings = AlertSettings()
 
         self.poll_task = None
-        self.event_tasks = set()
+        # Persisted poll state, used to avoid double-polling across reloads
+        self._poll_state = None
+        self._initial_delay = self.POLL_PERIOD
+        # Queue of pending stream events (handler, args), processed by the event workers
+        self._event_q: asyncio.Queue = asyncio.Queue(maxsize=self.EVENT_BACKLOG)
+        self._event_workers: list[asyncio.Task] = []
+
+        # Per-channel semaphores for alert delivery, channelid -> Semaphore
+        self._chan_sems: dict[int, asyncio.Semaphore] = {}
+
+        # Short-lived cache of our permissions in alert channels
+        # Map of channelid -> (expiry, permissions)
+        self._perm_cache: dict[int, tuple[float, discord.Permissions]] = {}
+
+        # Memoised subscription configs
+        # Map of subscriptionid -> (subscription, config)
+        self._alert_configs: dict[int, tuple[AlertsData.AlertChannel, AlertConfig]] = {}
 
         # Cache of currently live streams, maps streamerid -> stream
         self.live_streams = {}
 
+        # Streams which were recently seen to end, but have not been ended yet
+        # Map of streamerid -> (stream, end_at, monotonic time first seen ended)
+        self._recently_ended: dict[int, tuple[AlertsData.Stream, dt.datetime, float]] = {}
+
         # Cache of streamers we are watching state changes for
         # Map of streamerid -> streamer
         self.watching = {}
 
+        # Cache of alert subscriptions in each guild, for autocompletion
+        # Map of guildid -> list of (alert, streamer, display, display_lower)
+        self._alerts_by_guild: dict[int, list[tuple]] = {}
+
+        # Blocks of (at most) 100 watched streamerids to poll
+        # Reset whenever the watch list changes, and rebuilt on the next poll
+        self._poll_blocks: Optional[list[list[int]]] = None
+        self._poll_sem = asyncio.Semaphore(
+            bot.config.twitch.getint('poll_concurrency', fallback=4)
+        )
+
     async def cog_load(self):
         await self.data.init()
 
         await self.twitch_login()
         await self.load_subs()
+        await self.load_poll_state()
+        self._event_workers = [
+            asyncio.create_task(self._event_worker()) for _ in range(self.EVENT_WORKERS)
+        ]
         self.poll_task = asyncio.create_task(self.poll_live())
 
     async def twitch_login(self):
@@ -63,9 +110,9 @@ class AlertCog(LionCog):
         active_subs = await self.data.AlertChannel.fetch_where()
         to_watch = {sub.streamerid for sub in active_subs}
         live_streams = await self.data.Stream.fetch_where(
-            self.data.Stream.end_at != NULL
+            self.data.Stream.end_at == NULL
         )
-        to_watch.union(stream.streamerid for stream in live_streams)
+        to_watch.update(stream.streamerid for stream in live_streams)
 
         # Load associated streamers
         watching = {}
@@ -78,80 +125,251 @@ class AlertCog(LionCog):
 
         self.watching = watching
         self.live_streams = {stream.streamerid: stream for stream in live_streams}
+        if (unwatched := self.live_streams.keys() - watching.keys()):
+            logger.warning(
+                f"Loaded live streams for streamers {unwatched} which could not be watched. "
+                "These streams will be ended after the first successful poll, without streamer data."
+            )
+        self._poll_blocks = None
 
         logger.info(
             f"Watching {len(watching)} streamers for state changes. "
             f"Loaded {len(live_streams)} (previously) live streams into cache."
         )
 
+    async def load_poll_state(self):
+        """
+        Load the persisted poll state,
+        and delay the first poll so we don't repeat a recent one.
+        """
+        try:
+            self._poll_state = await self.data.PollState.fetch_or_create(self.bot.appname)
+        except Exception:
+            # Probably the poll state table has not been migrated, poll as normal without it
+            logger.warning(
+                "Could not load the persisted stream poll state. "
+                f"Delaying the first poll by the default {self.POLL_PERIOD} seconds.",
+                exc_info=True
+            )
+            self._poll_state = None
+            self._initial_delay = self.POLL_PERIOD
+            return
+        if (last_poll_at := self._poll_state.last_poll_at) is not None:
+            since = (utc_now() - last_poll_at).total_seconds()
+            self._initial_delay = max(0, self.POLL_PERIOD - since)
+
+    async def _save_poll_state(self):
+        """
+        Record the time of the last successful poll.
+        Failures are only logged, since the poll itself succeeded.
+        """
+        if self._poll_state is None:
+            return
+        try:
+            await self._poll_state.update(last_poll_at=utc_now())
+        except Exception:
+            logger.exception("Unexpected exception while saving the stream poll state.")
+
+    def _get_poll_blocks(self) -> list[list[int]]:
+        """
+        Get the blocks of streamerids to poll,
+        building them from the watch list if it has changed since the last poll.
+        `self._poll_blocks` must be reset to None whenever `self.watching` changes.
+        """
+        if self._poll_blocks is None:
+            to_request = list(self.watching)
+            self._poll_blocks = [to_request[i:i+100] for i in range(0, len(to_request), 100)]
+        return self._poll_blocks
+
+    async def _poll_block(self, block):
+        """
+        Request the current streams for a single block of (at most) 100 streamerids.
+        Returns a map streamerid -> stream for the live streamers in the block.
+        """
+        streaming = {}
+        async with self._poll_sem:
+            async for stream in self.twitch.get_streams(user_id=block, first=100):
+                # Note we set page size to 100
+                # So we should never get repeat or missed streams
+                # Since we can request a max of 100 userids anyway.
+                streaming[int(stream.user_id)] = stream
+        return streaming
+
     async def poll_live(self):
         # Every PERIOD seconds,
         # request get_streams for the streamers we are currently watching.
         # Check if they are in the live_stream cache,
-        # and update cache and data and fire-and-forget start/stop events as required.
-        # TODO: Logging
-        # TODO: Error handling so the poll loop doesn't die from temporary errors
-        # And when it does die it gets logged properly.
+        # and update cache and data and queue start/stop events as required.
         if not self.twitch:
             raise ValueError("Attempting to start alert poll-loop before twitch set.")
 
-        block_i = 0
+        backoff = self.POLL_PERIOD
+        delay = self._initial_delay
 
         self.polling = True
         while self.polling:
-            await asyncio.sleep(self.POLL_PERIOD)
-
-            to_request = list(self.watching.keys())
-            if not to_request:
-                continue
-            # Each loop we request the 'next' slice of 100 userids
-            blocks = [to_request[i:i+100] for i in range(0, len(to_request), 100)]
-            block_i += 1
-            block_i %= len(blocks)
-            block = blocks[block_i]
-
-            streaming = {}
-            async for stream in self.twitch.get_streams(user_id=block, first=100):
-                # Note we set page size to 100
-                # So we should never get repeat or missed streams
-                # Since we can request a max of 100 userids anyway.
-                streaming[int(stream.user_id)] = stream
-
-            started = set(streaming.keys()).difference(self.live_streams.keys())
-            ended = set(self.live_streams.keys()).difference(streaming.keys())
-
-            for streamerid in started:
-                stream = streaming[streamerid]
-                stream_data = await self.data.Stream.create(
-                    streamerid=int(stream.user_id),
-                    start_at=stream.started_at,
-                    twitch_stream_id=int(stream.id),
-                    game_name=stream.game_name,
-                    title=stream.title,
+            await asyncio.sleep(delay)
+            try:
+                await self.poll_once()
+            except Exception:
+                # Back off on (probably temporary) errors instead of letting the loop die
+                logger.exception(
+                    f"Unexpected exception while polling stream states. Retrying in {backoff} seconds."
                 )
+                delay = backoff + random.uniform(0, self.POLL_JITTER)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+            else:
+                backoff = self.POLL_PERIOD
+                await self._save_poll_state()
+                delay = self.POLL_PERIOD + random.uniform(0, self.POLL_JITTER)
+
+    async def poll_once(self):
+        """
+        Poll the stream state of every watched streamer once,
+        and update the cache, data, and fire start/stop events as required.
+        """
+        blocks = self._get_poll_blocks()
+        if not blocks:
+            return
+
+        # Request every block concurrently, bounded by the poll semaphore
+        results = await asyncio.gather(
+            *(self._poll_block(block) for block in blocks),
+            return_exceptions=True
+        )
+        streaming = {}
+        failed = set()
+        errors = []
+        for block, result in zip(blocks, results):
+            if isinstance(result, BaseException):
+                errors.append(result)
+                failed.update(block)
+            else:
+                streaming.update(result)
+
+        # Still handle the blocks we did poll, then fail so the poll loop backs off
+        await self._handle_transitions(streaming, failed)
+        if errors:
+            raise ValueError(
+                f"Failed to poll stream state for {len(errors)} of {len(blocks)} blocks."
+            ) from errors[0]
+
+    async def _handle_transitions(self, streaming, failed):
+        """
+        Update the cache, data, and fire start/stop events,
+        given the current `streaming` map of polled streamers.
+        Streamers in `failed` were not polled, and are never ended.
+        """
+        started = streaming.keys() - self.live_streams.keys()
+        ended = self.live_streams.keys() - streaming.keys()
+        if failed:
+            # Streamers in blocks we failed to poll can't be seen to have ended
+            ended -= failed
+
+        # Hold ended streams for FLAP_WINDOW seconds before actually ending them,
+        # so short Twitch outages or stream flaps don't re-announce the stream
+        now = time.monotonic()
+        for streamerid in ended:
+            self._recently_ended[streamerid] = (self.live_streams.pop(streamerid), utc_now(), now)
+
+        for streamerid in started & self._recently_ended.keys():
+            stream_data, _, _ = self._recently_ended[streamerid]
+            if stream_data.twitch_stream_id == int(streaming[streamerid].id):
+                # Same stream came back, restore it without announcing
+                self._recently_ended.pop(streamerid)
                 self.live_streams[streamerid] = stream_data
-                task = asyncio.create_task(self.on_stream_start(stream_data))
-                self.event_tasks.add(task)
-                task.add_done_callback(self.event_tasks.discard)
-
-            for streamerid in ended:
-                stream_data = self.live_streams.pop(streamerid)
-                await stream_data.update(end_at=utc_now())
-                task = asyncio.create_task(self.on_stream_end(stream_data))
-                self.event_tasks.add(task)
-                task.add_done_callback(self.event_tasks.discard)
-
-    async def on_stream_start(self, stream_data):
-        # Get channel subscriptions listening for this streamer
+                started.discard(streamerid)
+
+        # Actually end held streams which have expired, or were replaced by a new stream
+        expired = {
+            streamerid for streamerid, (_, _, held_at) in self._recently_ended.items()
+            if streamerid in started or now - held_at >= self.FLAP_WINDOW
+        }
+
+        if not (started or expired):
+            return
+
+        # Fetch the subscriptions and streamers for every transition at once
+        subs_by_uid = defaultdict(list)
+        transitioned = list(started | expired)
+        for sub in await self.data.AlertChannel.fetch_where(streamerid=transitioned):
+            subs_by_uid[sub.streamerid].append(sub)
+        streamers = await self.data.Streamer.fetch_where(userid=transitioned)
+        streamers_by_id = {streamer.userid: streamer for streamer in streamers}
+
+        for streamerid in expired:
+            stream_data, end_at, _ = self._recently_ended.pop(streamerid)
+            await stream_data.update(end_at=end_at)
+            await self._queue_event(
+                self.on_stream_end,
+                stream_data, subs_by_uid[streamerid], streamers_by_id.get(streamerid)
+            )
+
+        for streamerid in started:
+            stream = streaming[streamerid]
+            stream_data = await self.data.Stream.create(
+                streamerid=int(stream.user_id),
+                start_at=stream.started_at,
+                twitch_stream_id=int(stream.id),
+                game_name=stream.game_name,
+                title=stream.title,
+            )
+            self.live_streams[streamerid] = stream_data
+            await self._queue_event(
+                self.on_stream_start,
+                stream_data, subs_by_uid[streamerid], streamers_by_id.get(streamerid)
+            )
+
+    async def _queue_event(self, handler, *args):
+        """
+        Queue the given event handler to be run by the event workers.
+        If the queue is full, wait for a worker to pick up an event first.
+        """
+        if self._event_q.full():
+            logger.warning(
+                f"Stream event backlog is full with {self._event_q.qsize()} pending events. "
+                "Waiting for an event to complete before adding more."
+            )
+        await self._event_q.put((handler, args))
+
+    async def _event_worker(self):
+        """
+        Run queued stream event handlers until cancelled.
+        """
+        while True:
+            handler, args = await self._event_q.get()
+            try:
+                await handler(*args)
+            except Exception:
+                logger.exception(
+                    f"Unhandled exception in stream event handler {handler.__name__}."
+                )
+            finally:
+                self._event_q.task_done()
+
+    async def on_stream_start(self, stream_data, subbed, streamer):
+        # subbed are the channel subscriptions listening for this streamer
         uid = int(stream_data.streamerid)
         logger.info(f"Streamer <uid:{uid}> started streaming! {stream_data=}")
-        subbed = await self.data.AlertChannel.fetch_where(streamerid=uid)
 
         # Fulfill those alerts
-        for sub in subbed:
+        await asyncio.gather(*(self._safe_sub_alert(sub, stream_data, streamer) for sub in subbed))
+
+    def _channel_lock(self, channelid) -> asyncio.Semaphore:
+        """
+        Semaphore serialising alert traffic to a single Discord channel,
+        so sends to different channels may run concurrently.
+        """
+        sem = self._chan_sems.get(channelid)
+        if sem is None:
+            sem = self._chan_sems[channelid] = asyncio.Semaphore(1)
+        return sem
+
+    async def _safe_sub_alert(self, sub, stream_data, streamer):
+        async with self._channel_lock(sub.channelid):
             try:
                 # If the sub is paused, don't create the alert
-                await self.sub_alert(sub, stream_data)
+                await self.sub_alert(sub, stream_data, streamer=streamer)
             except discord.HTTPException:
                 # TODO: Needs to be handled more gracefully at user level
                 # Retry logic?
@@ -175,7 +393,31 @@ class AlertCog(LionCog):
             f"Subscription error {subscription=} {stream_data=} {err_msg=}"
         )
 
-    async def sub_alert(self, subscription, stream_data):
+    def _alert_config(self, subscription) -> AlertConfig:
+        """
+        Get the memoised AlertConfig for the given subscription row.
+        """
+        cached = self._alert_configs.get(subscription.subscriptionid)
+        if cached is None or cached[0] is not subscription:
+            # New subscription, or the row was reloaded
+            cached = (subscription, AlertConfig(subscription.subscriptionid, subscription))
+            self._alert_configs[subscription.subscriptionid] = cached
+        return cached[1]
+
+    def _bot_permissions(self, channel) -> discord.Permissions:
+        """
+        Permissions of the bot member in the given channel.
+        Cached for PERMISSION_TTL seconds, since alert fan-out checks the same channels repeatedly.
+        """
+        now = time.monotonic()
+        cached = self._perm_cache.get(channel.id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        permissions = channel.permissions_for(channel.guild.me)
+        self._perm_cache[channel.id] = (now + self.PERMISSION_TTL, permissions)
+        return permissions
+
+    async def sub_alert(self, subscription, stream_data, streamer=None):
         # Base alert behaviour is just to send a message
         # and create an alert row
 
@@ -188,7 +430,7 @@ class AlertCog(LionCog):
                 "Subscription channel no longer exists."
             )
             return
-        permissions = channel.permissions_for(channel.guild.me)
+        permissions = self._bot_permissions(channel)
         if not (permissions.send_messages and permissions.embed_links):
             await self.subscription_error(
                 subscription, stream_data,
@@ -197,7 +439,7 @@ class AlertCog(LionCog):
             return
 
         # Build message
-        streamer = await self.data.Streamer.fetch(int(stream_data.streamerid))
+        streamer = streamer or await self.data.Streamer.fetch(int(stream_data.streamerid))
         if not streamer:
             # Streamer was deleted while handling the alert
             # Just quietly ignore
@@ -208,7 +450,7 @@ class AlertCog(LionCog):
             )
             return
 
-        alert_config = AlertConfig(subscription.subscriptionid, subscription)
+        alert_config = self._alert_config(subscription)
         paused = alert_config.get(self.alert_settings.AlertPaused.setting_id)
         if paused.value:
             logger.info(f"Skipping alert for subscription {subscription=} because it is paused.")
@@ -244,16 +486,18 @@ class AlertCog(LionCog):
             f"Fulfilled subscription {subscription.subscriptionid} with alert {alert.alertid}"
         )
 
-    async def on_stream_end(self, stream_data):
-        # Get channel subscriptions listening for this streamer
+    async def on_stream_end(self, stream_data, subbed, streamer):
+        # subbed are the channel subscriptions listening for this streamer
         uid = int(stream_data.streamerid)
         logger.info(f"Streamer <uid:{uid}> stopped streaming! {stream_data=}")
-        subbed = await self.data.AlertChannel.fetch_where(streamerid=uid)
 
         # Resolve subscriptions
-        for sub in subbed:
+        await asyncio.gather(*(self._safe_sub_resolve(sub, stream_data, streamer) for sub in subbed))
+
+    async def _safe_sub_resolve(self, sub, stream_data, streamer):
+        async with self._channel_lock(sub.channelid):
             try:
-                await self.sub_resolve(sub, stream_data)
+                await self.sub_resolve(sub, stream_data, streamer=streamer)
             except discord.HTTPException:
                 # TODO: Needs to be handled more gracefully at user level
                 # Retry logic?
@@ -266,30 +510,25 @@ class AlertCog(LionCog):
                 )
                 raise
 
-    async def sub_resolve(self, subscription, stream_data):
-        # Check if there is a current active alert to resolve
-        alerts = await self.data.StreamAlert.fetch_where(
-            streamid=int(stream_data.streamid),
-            subscriptionid=int(subscription.subscriptionid),
+    async def sub_resolve(self, subscription, stream_data, streamer=None):
+        # Resolve the current active alert, if there is one
+        alerts = await self.data.StreamAlert.mark_resolved(
+            int(stream_data.streamid),
+            int(subscription.subscriptionid),
+            utc_now()
         )
         if not alerts:
-            logger.info(
-                f"Resolution requested for subscription {subscription.subscriptionid} with stream {stream_data.streamid} "
-                "but no active alerts were found."
-            )
-            return
-        alert = alerts[0]
-        if alert.resolved_at is not None:
-            # Alert was already resolved
+            # Alert may have already been resolved
             # This is okay, Twitch might have just sent the stream ending twice
             logger.info(
                 f"Resolution requested for subscription {subscription.subscriptionid} with stream {stream_data.streamid} "
-                "but alert was already resolved."
+                "but no unresolved alerts were found."
             )
             return
+        alert = alerts[0]
 
         # Check if message is to be deleted or edited (or nothing)
-        alert_config = AlertConfig(subscription.subscriptionid, subscription)
+        alert_config = self._alert_config(subscription)
         del_setting = alert_config.get(self.alert_settings.AlertEndDelete.setting_id)
         edit_setting = alert_config.get(self.alert_settings.AlertEndMessage.setting_id)
 
@@ -322,7 +561,7 @@ class AlertCog(LionCog):
                         )
                 else:
                     # Edit message with custom arguments
-                    streamer = await self.data.Streamer.fetch(int(stream_data.streamerid))
+                    streamer = streamer or await self.data.Streamer.fetch(int(stream_data.streamerid))
                     formatter = await edit_setting.generate_formatter(self.bot, stream_data, streamer)
                     formatted = await formatter(edit_setting.value)
                     args = edit_setting.value_to_args(subscription.subscriptionid, formatted)
@@ -337,12 +576,25 @@ class AlertCog(LionCog):
             # Explicitly don't need to do anything to the alert
             pass
 
-        # Save alert as resolved
-        await alert.update(resolved_at=utc_now())
-
     async def cog_unload(self):
-        if self.poll_task is not None and not self.poll_task.cancelled():
+        if self.poll_task is not None and not self.poll_task.done():
             self.poll_task.cancel()
+            try:
+                await self.poll_task
+            except asyncio.CancelledError:
+                pass
+
+        # Let the workers finish the events already queued, since their stream state is already written
+        try:
+            await asyncio.wait_for(self._event_q.join(), timeout=self.EVENT_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Timed out waiting for stream events to complete during unload. "
+                f"Dropping {self._event_q.qsize()} pending events."
+            )
+        for worker in self._event_workers:
+            worker.cancel()
+        self._event_workers = []
 
         if self.twitch is not None:
             await self.twitch.close()
@@ -414,8 +666,12 @@ class AlertCog(LionCog):
             paused=False
         )
 
+        self.invalidate_guild_alerts(sub_data.guildid)
+
         # Add to watchlist
-        self.watching[streamer_data.userid] = streamer_data
+        if streamer_data.userid not in self.watching:
+            self.watching[streamer_data.userid] = streamer_data
+            self._poll_blocks = None
 
         # Open AlertEditorUI for the new subscription
         await ctx.reply("StreamAlert Created.")
@@ -423,14 +679,51 @@ class AlertCog(LionCog):
         await ui.run(ctx.interaction)
         await ui.wait()
 
+    def forget_subscription(self, sub_data):
+        """
+        Drop all cached state for a deleted subscription.
+        """
+        self._alert_configs.pop(sub_data.subscriptionid, None)
+        self.invalidate_guild_alerts(sub_data.guildid)
+
+    def invalidate_guild_alerts(self, guildid):
+        """
+        Drop the cached alert list for this guild.
+        Must be called whenever a guild's alerts are created, removed, or moved.
+        """
+        self._alerts_by_guild.pop(guildid, None)
+
+    async def _guild_alert_entries(self, guild: discord.Guild):
+        """
+        Get the (cached) autocomplete entries for the alerts in this guild.
+        Each entry is a tuple (alert, streamer, display, display_lower).
+        """
+        entries = self._alerts_by_guild.get(guild.id)
+        if entries is None:
+            entries = []
+            alerts = await self.data.AlertChannel.fetch_where(guildid=guild.id)
+            for alert in alerts:
+                streamer = self.watching.get(alert.streamerid)
+                if streamer is None:
+                    streamer = await self.data.Streamer.fetch(alert.streamerid)
+                if streamer is None:
+                    # Should be impossible by foreign key condition
+                    # Might be a stale cache
+                    continue
+                channel = guild.get_channel(alert.channelid)
+                display = f"{streamer.display_name} in #{channel.name if channel else 'unknown'}"
+                entries.append((alert, streamer, display, display.lower()))
+            self._alerts_by_guild[guild.id] = entries
+        return entries
+
     async def alert_acmpl(self, interaction: discord.Interaction, partial: str):
         if not interaction.guild:
             raise ValueError("Cannot acmpl alert in guildless interaction.")
 
         # Get all alerts in the server
-        alerts = await self.data.AlertChannel.fetch_where(guildid=interaction.guild_id)
+        entries = await self._guild_alert_entries(interaction.guild)
 
-        if not alerts:
+        if not entries:
             # No alerts available
             options = [
                 appcmds.Choice(
@@ -440,15 +733,18 @@ class AlertCog(LionCog):
             ]
         else:
             options = []
-            for alert in alerts:
-                streamer = await self.data.Streamer.fetch(alert.streamerid)
-                if streamer is None:
-                    # Should be impossible by foreign key condition
-                    # Might be a stale cache
-                    continue
-                channel = interaction.guild.get_channel(alert.channelid)
-                display = f"{streamer.display_name} in #{channel.name if channel else 'unknown'}"
-                if partial.lower() in display.lower():
+            if partial.isdigit():
+                # Might already be a subscriptionid (e.g. from a rerun command)
+                for alert, _, display, _ in entries:
+                    if alert.subscriptionid == int(partial):
+                        options.append(appcmds.Choice(name=display, value=partial))
+                        break
+            needle = partial.lower()
+            for alert, _, display, display_lower in entries:
+                if len(options) == 25:
+                    # Discord won't accept any more choices
+                    break
+                if needle in display_lower and str(alert.subscriptionid) != partial:
                     # Matching option
                     options.append(appcmds.Choice(name=display, value=str(alert.subscriptionid)))
             if not options:
@@ -475,25 +771,18 @@ class AlertCog(LionCog):
             )
         return alert
 
-    @streamalert_group.command(
-        name='edit',
-        description=(
-            "Update settings for an existing Twitch stream alert."
-        )
-    )
-    @appcmds.describe(
-        alert="Which alert do you want to edit?",
-        # TODO: Other settings here
-    )
-    @appcmds.default_permissions(manage_channels=True)
-    async def streamalert_edit_cmd(self, ctx: LionContext, alert: str):
+    async def _resolve_and_authorize(self, ctx: LionContext, alert_str: str):
+        """
+        Resolve the provided alert and check the author may edit it.
+        Returns the alert subscription, or None after replying with an error.
+        """
         # Type guards
         assert ctx.guild is not None, "Guild-only command has no guild ctx."
         assert self.twitch is not None, "Twitch command run with no twitch obj."
         assert ctx.interaction is not None, "Twitch command needs interaction ctx."
 
         # Look up provided alert
-        sub_data = await self.resolve_alert(ctx.interaction, alert)
+        sub_data = await self.resolve_alert(ctx.interaction, alert_str)
 
         # Check user permissions for editing this alert
         channel = ctx.guild.get_channel(sub_data.channelid)
@@ -503,7 +792,25 @@ class AlertCog(LionCog):
                 "Sorry, you need the `MANAGE_CHANNELS` permission "
                 "in this channel to edit the stream alert."
             )
+            return None
+        return sub_data
+
+    @streamalert_group.command(
+        name='edit',
+        description=(
+            "Update settings for an existing Twitch stream alert."
+        )
+    )
+    @appcmds.describe(
+        alert="Which alert do you want to edit?",
+        # TODO: Other settings here
+    )
+    @appcmds.default_permissions(manage_channels=True)
+    async def streamalert_edit_cmd(self, ctx: LionContext, alert: str):
+        sub_data = await self._resolve_and_authorize(ctx, alert)
+        if sub_data is None:
             return
+
         # If edit options have been given, save edits and retouch cache if needed
         # If not, open AlertEditorUI
         ui = AlertEditorUI(bot=self.bot, sub_data=sub_data, callerid=ctx.author.id)
@@ -525,22 +832,8 @@ class AlertCog(LionCog):
     )
     @appcmds.default_permissions(manage_channels=True)
     async def streamalert_pause_cmd(self, ctx: LionContext, alert: str):
-        # Type guards
-        assert ctx.guild is not None, "Guild-only command has no guild ctx."
-        assert self.twitch is not None, "Twitch command run with no twitch obj."
-        assert ctx.interaction is not None, "Twitch command needs interaction ctx."
-
-        # Look up provided alert
-        sub_data = await self.resolve_alert(ctx.interaction, alert)
-
-        # Check user permissions for editing this alert
-        channel = ctx.guild.get_channel(sub_data.channelid)
-        permlevel = channel if channel else ctx.guild
-        if not permlevel.permissions_for(ctx.author).manage_channels:
-            await ctx.error_reply(
-                "Sorry, you need the `MANAGE_CHANNELS` permission "
-                "in this channel to edit the stream alert."
-            )
+        sub_data = await self._resolve_and_authorize(ctx, alert)
+        if sub_data is None:
             return
 
         await sub_data.update(paused=True)
@@ -557,22 +850,8 @@ class AlertCog(LionCog):
     )
     @appcmds.default_permissions(manage_channels=True)
     async def streamalert_unpause_cmd(self, ctx: LionContext, alert: str):
-        # Type guards
-        assert ctx.guild is not None, "Guild-only command has no guild ctx."
-        assert self.twitch is not None, "Twitch command run with no twitch obj."
-        assert ctx.interaction is not None, "Twitch command needs interaction ctx."
-
-        # Look up provided alert
-        sub_data = await self.resolve_alert(ctx.interaction, alert)
-
-        # Check user permissions for editing this alert
-        channel = ctx.guild.get_channel(sub_data.channelid)
-        permlevel = channel if channel else ctx.guild
-        if not permlevel.permissions_for(ctx.author).manage_channels:
-            await ctx.error_reply(
-                "Sorry, you need the `MANAGE_CHANNELS` permission "
-                "in this channel to edit the stream alert."
-            )
+        sub_data = await self._resolve_and_authorize(ctx, alert)
+        if sub_data is None:
             return
 
         await sub_data.update(paused=False)
@@ -589,23 +868,10 @@ class AlertCog(LionCog):
     )
     @appcmds.default_permissions(manage_channels=True)
     async def streamalert_remove_cmd(self, ctx: LionContext, alert: str):
-        # Type guards
-        assert ctx.guild is not None, "Guild-only command has no guild ctx."
-        assert self.twitch is not None, "Twitch command run with no twitch obj."
-        assert ctx.interaction is not None, "Twitch command needs interaction ctx."
-
-        # Look up provided alert
-        sub_data = await self.resolve_alert(ctx.interaction, alert)
-
-        # Check user permissions for editing this alert
-        channel = ctx.guild.get_channel(sub_data.channelid)
-        permlevel = channel if channel else ctx.guild
-        if not permlevel.permissions_for(ctx.author).manage_channels:
-            await ctx.error_reply(
-                "Sorry, you need the `MANAGE_CHANNELS` permission "
-                "in this channel to edit the stream alert."
-            )
+        sub_data = await self._resolve_and_authorize(ctx, alert)
+        if sub_data is None:
             return
 
         await sub_data.delete()
+        self.forget_subscription(sub_data)
         await ctx.reply("This alert has been deleted.")
@@ -1,9 +1,19 @@
+from meta import conf
 from data import Registry, RowModel
+from data.conditions import NULL
 from data.columns import Integer, Bool, Timestamp, String
 from data.models import WeakCache
 from cachetools import TTLCache
 
 
+DAY_SECS = 24 * 60 * 60
+
+# Cache sizes should cover the expected number of concurrently live streams and their alerts
+STREAM_CACHE_SIZE = conf.twitch.getint('stream_cache_size', fallback=1000)
+STREAM_ALERT_CACHE_SIZE = conf.twitch.getint('stream_alert_cache_size', fallback=1000)
+STREAMER_CACHE_SIZE = conf.twitch.getint('streamer_cache_size', fallback=5000)
+
+
 class AlertsData(Registry):
     class Streamer(RowModel):
         """
@@ -16,7 +26,7 @@ class AlertsData(Registry):
         );
         """
         _tablename_ = 'streamers'
-        _cache_ = {}
+        _cache_ = WeakCache(TTLCache(maxsize=STREAMER_CACHE_SIZE, ttl=DAY_SECS))
 
         userid = Integer(primary=True)
         login_name = String()
@@ -71,7 +81,7 @@ class AlertsData(Registry):
         );
         """
         _tablename_ = 'streams'
-        _cache_ = WeakCache(TTLCache(maxsize=100, ttl=24*60*60))
+        _cache_ = WeakCache(TTLCache(maxsize=STREAM_CACHE_SIZE, ttl=DAY_SECS))
 
         streamid = Integer(primary=True)
         streamerid = Integer()
@@ -95,7 +105,7 @@ class AlertsData(Registry):
         );
         """
         _tablename_ = 'stream_alerts'
-        _cache_ = WeakCache(TTLCache(maxsize=1000, ttl=24*60*60))
+        _cache_ = WeakCache(TTLCache(maxsize=STREAM_ALERT_CACHE_SIZE, ttl=DAY_SECS))
 
         alertid = Integer(primary=True)
         streamid = Integer()
@@ -103,3 +113,33 @@ class AlertsData(Registry):
         sent_at = Timestamp()
         messageid = Integer()
         resolved_at = Timestamp()
+
+        @classmethod
+        async def mark_resolved(cls, streamid: int, subscriptionid: int, resolved_at):
+            """
+            Mark the unresolved alerts for the given stream and subscription as resolved,
+            in a single query.
+
+            Returns the updated alert rows (usually at most one) as model rows,
+            so already-resolved alerts are never returned.
+            """
+            return await cls.table.update_where(
+                cls.resolved_at == NULL,
+                streamid=streamid,
+                subscriptionid=subscriptionid,
+            ).set(resolved_at=resolved_at).with_adapter(cls._make_rows)
+
+    class PollState(RowModel):
+        """
+        Schema
+        ------
+        CREATE TABLE stream_alert_polls(
+          appname TEXT PRIMARY KEY,
+          last_poll_at TIMESTAMPTZ
+        );
+        """
+        _tablename_ = 'stream_alert_polls'
+        _cache_ = {}
+
+        appname = String(primary=True)
+        last_poll_at = Timestamp()
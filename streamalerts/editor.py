@@ -1,8 +1,7 @@
 import asyncio
 import datetime as dt
 from collections import namedtuple
-from functools import wraps
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import discord
 from discord.ui.button import button, Button, ButtonStyle
@@ -46,27 +45,66 @@ class AlertEditorUI(MessageUI):
         self.cog: 'AlertCog' = bot.get_cog('AlertCog')
         self.config = Config(self.subid, sub_data)
 
+        # Ending mode menu options, built once and only re-defaulted on refresh
+        self._ending_mode_options = [
+            SelectOption(
+                label="Do Nothing",
+                description="Don't modify the live alert message.",
+                value="0",
+            ),
+            SelectOption(
+                label="Delete Alert After Stream",
+                description="Delete the live alert message.",
+                value="1",
+            ),
+            SelectOption(
+                label="Edit Alert After Stream",
+                description="Edit the live alert message to a custom message. Opens editor.",
+                value="2",
+            ),
+        ]
+
+        # Fake stream data for previewing alert messages, built when first needed
+        self._preview_stream: Optional[FakeStream] = None
+
+        # Whether the last applied layout included the edit end button
+        self._last_show_end_edit = None
+
+        # Streamer row for this alert, cached for the lifetime of the editor
+        # since the streamer can't be changed from this UI
+        self._streamer_cache = None
+
     # ----- UI API -----
     def preview_stream_data(self):
         # TODO: Probably makes sense to factor this out to the cog
         # Or even generate it in the formatters themselves
-        data = self.sub_data
-        return FakeStream(
-            -1,
-            data.streamerid,
-            utc_now() - dt.timedelta(hours=1),
-            -1,
-            "Art",
-            "Testing Go Live Message",
-            utc_now()
-        )
+        # Shared between the live and end editors, so their previews are consistent
+        if self._preview_stream is None:
+            now = utc_now()
+            self._preview_stream = FakeStream(
+                -1,
+                self.sub_data.streamerid,
+                now - dt.timedelta(hours=1),
+                -1,
+                "Art",
+                "Testing Go Live Message",
+                now
+            )
+        return self._preview_stream
+
+    async def _get_streamer(self):
+        """
+        Get the streamer for this alert, fetching it only once.
+        """
+        if self._streamer_cache is None:
+            self._streamer_cache = await self.cog.data.Streamer.fetch(self.sub_data.streamerid)
+        return self._streamer_cache
 
     def call_and_refresh(self, func):
         """
         Generate a wrapper which runs coroutine 'func' and then refreshes the UI.
         """
         # TODO: Check whether the UI has finished interaction
-        @wraps(func)
         async def wrapped(*args, **kwargs):
             await func(*args, **kwargs)
             await self.refresh()
@@ -77,13 +115,13 @@ class AlertEditorUI(MessageUI):
     # Pause button
     @button(label="PAUSE_PLACEHOLDER", style=ButtonStyle.blurple)
     async def pause_button(self, press: discord.Interaction, pressed: Button):
-        await press.response.defer(thinking=True, ephemeral=True)
         setting = self.config.get(Settings.AlertPaused.setting_id)
         setting.value = not setting.value
-        await setting.write()
-        await self.refresh(thinking=press)
+        # Write the setting while we respond to the interaction
+        await asyncio.gather(setting.write(), press.response.defer(thinking=False))
+        await self.refresh()
 
-    async def pause_button_refresh(self):
+    def pause_button_refresh(self):
         button = self.pause_button
         if self.config.get(Settings.AlertPaused.setting_id).value:
             button.label = "UnPause"
@@ -97,6 +135,7 @@ class AlertEditorUI(MessageUI):
     async def delete_button(self, press: discord.Interaction, pressed: Button):
         await press.response.defer(thinking=True, ephemeral=True)
         await self.sub_data.delete()
+        self.cog.forget_subscription(self.sub_data)
         embed = discord.Embed(
             colour=discord.Colour.brand_green(),
             description="Stream alert removed."
@@ -119,7 +158,7 @@ class AlertEditorUI(MessageUI):
         setting = self.config.get(Settings.AlertMessage.setting_id)
 
         stream = self.preview_stream_data()
-        streamer = await self.cog.data.Streamer.fetch(self.sub_data.streamerid)
+        streamer = await self._get_streamer()
 
         editor = MsgEditor(
             self.bot,
@@ -146,7 +185,7 @@ class AlertEditorUI(MessageUI):
             setting.value = alert_setting.value
 
         stream = self.preview_stream_data()
-        streamer = await self.cog.data.Streamer.fetch(self.sub_data.streamerid)
+        streamer = await self._get_streamer()
 
         editor = MsgEditor(
             self.bot,
@@ -177,14 +216,16 @@ class AlertEditorUI(MessageUI):
         if value == '0':
             # In Do Nothing case,
             # Ensure Delete is off and custom edit message is unset
+            to_write = []
             setting = self.config.get(Settings.AlertEndDelete.setting_id)
             if setting.value:
                 setting.value = False
-                await setting.write()
+                to_write.append(setting)
             setting = self.config.get(Settings.AlertEndMessage.setting_id)
             if setting.value:
                 setting.value = None
-                await setting.write()
+                to_write.append(setting)
+            await self.config.write_many(*to_write)
 
             await self.refresh(thinking=selection)
         elif value == '1':
@@ -208,25 +249,10 @@ class AlertEditorUI(MessageUI):
             await self.open_end_editor(selection)
             await self.refresh()
 
-    async def ending_mode_menu_refresh(self):
-        # Build menu options
-        options = [
-            SelectOption(
-                label="Do Nothing",
-                description="Don't modify the live alert message.",
-                value="0",
-            ),
-            SelectOption(
-                label="Delete Alert After Stream",
-                description="Delete the live alert message.",
-                value="1",
-            ),
-            SelectOption(
-                label="Edit Alert After Stream",
-                description="Edit the live alert message to a custom message. Opens editor.",
-                value="2",
-            ),
-        ]
+    def ending_mode_menu_refresh(self):
+        options = self._ending_mode_options
+        for option in options:
+            option.default = False
 
         # Calculate the correct default
         if self.config.get(Settings.AlertEndDelete.setting_id).value:
@@ -243,15 +269,16 @@ class AlertEditorUI(MessageUI):
             min_values=0, max_values=1)
     async def channel_menu(self, selection: discord.Interaction, selected):
         if selected.values:
-            await selection.response.defer(thinking=True, ephemeral=True)
+            await selection.response.defer(thinking=False)
             setting = self.config.get(Settings.AlertChannel.setting_id)
             setting.value = selected.values[0]
             await setting.write()
-            await self.refresh(thinking=selection)
+            self.cog.invalidate_guild_alerts(self.sub_data.guildid)
+            await self.refresh()
         else:
             await selection.response.defer(thinking=False)
 
-    async def channel_menu_refresh(self):
+    def channel_menu_refresh(self):
         # current = self.config.get(Settings.AlertChannel.setting_id).value
         # TODO: Check if discord-typed menus can have defaults yet
         # Impl in stable dpy, but not released to pip yet
@@ -259,16 +286,23 @@ class AlertEditorUI(MessageUI):
 
     # ----- UI Flow -----
     async def make_message(self) -> MessageArgs:
-        streamer = await self.cog.data.Streamer.fetch(self.sub_data.streamerid)
+        streamer = await self._get_streamer()
         if streamer is None:
             raise ValueError("Streamer row does not exist in AlertEditor")
         name = streamer.display_name
 
+        config = self.config
+        channel_setting = config.get(Settings.AlertChannel.setting_id)
+        paused_setting = config.get(Settings.AlertPaused.setting_id)
+        message_setting = config.get(Settings.AlertMessage.setting_id)
+        del_setting = config.get(Settings.AlertEndDelete.setting_id)
+        end_msg_setting = config.get(Settings.AlertEndMessage.setting_id)
+
         # Build relevant setting table
         table_map = {}
-        table_map['Channel'] = self.config.get(Settings.AlertChannel.setting_id).formatted
+        table_map['Channel'] = channel_setting.formatted
         table_map['Streamer'] = f"https://www.twitch.tv/{streamer.login_name}"
-        table_map['Paused'] = self.config.get(Settings.AlertPaused.setting_id).formatted
+        table_map['Paused'] = paused_setting.formatted
 
         prop_table = '\n'.join(tabulate(*table_map.items()))
 
@@ -279,16 +313,15 @@ class AlertEditorUI(MessageUI):
             timestamp=utc_now()
         )
 
-        message_setting = self.config.get(Settings.AlertMessage.setting_id)
         message_desc_lines = [
             f"An alert message will be posted to {table_map['Channel']}.",
             f"Press `{self.edit_alert_button.label}`"
             " to preview or edit the alert.",
             "The following keys will be substituted in the alert message."
         ]
-        keytable = tabulate(*message_setting._subkey_desc.items())
-        for line in keytable:
-            message_desc_lines.append(f"> {line}")
+        message_desc_lines.extend(
+            f"> {line}" for line in tabulate(*message_setting._subkey_desc.items())
+        )
 
         embed.add_field(
             name=f"When {name} goes live",
@@ -297,9 +330,6 @@ class AlertEditorUI(MessageUI):
         )
         
         # Determine the ending behaviour
-        del_setting = self.config.get(Settings.AlertEndDelete.setting_id)
-        end_msg_setting = self.config.get(Settings.AlertEndMessage.setting_id)
-
         if del_setting.value:
             # Deleting
             end_msg_desc = "The live alert message will be deleted."
@@ -312,11 +342,7 @@ class AlertEditorUI(MessageUI):
                 "The following substitution keys are supported "
                 "*in addition* to the live alert keys."
             ]
-            keytable = tabulate(
-                *[(k, v) for k, v in end_msg_setting._subkey_desc.items() if k not in message_setting._subkey_desc]
-            )
-            for line in keytable:
-                lines.append(f"> {line}")
+            lines.extend(f"> {line}" for line in tabulate(*end_msg_setting._extra_subkey_items))
             end_msg_desc = '\n'.join(lines)
         else:
             # Doing nothing
@@ -335,19 +361,20 @@ class AlertEditorUI(MessageUI):
         # Note self.config references the sub_data, and doesn't need reloading.
 
     async def refresh_layout(self):
-        to_refresh = (
-            self.pause_button_refresh(),
-            self.channel_menu_refresh(),
-            self.ending_mode_menu_refresh(),
-        )
-        await asyncio.gather(*to_refresh)
+        self.pause_button_refresh()
+        self.channel_menu_refresh()
+        self.ending_mode_menu_refresh()
 
-        show_end_edit = (
-            not self.config.get(Settings.AlertEndDelete.setting_id).value
+        config = self.config
+        show_end_edit = bool(
+            not config.get(Settings.AlertEndDelete.setting_id).value
             and
-            self.config.get(Settings.AlertEndMessage.setting_id).value
+            config.get(Settings.AlertEndMessage.setting_id).value
         )
-
+        if show_end_edit == self._last_show_end_edit:
+            # Layout is unchanged, the components were updated in place
+            return
+        self._last_show_end_edit = show_end_edit
 
         if not show_end_edit:
             # Don't show edit end button
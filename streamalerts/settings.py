@@ -1,5 +1,5 @@
 from typing import Optional, Any
-import json
+import re
 
 from meta.LionBot import LionBot
 from settings import ModelData
@@ -7,7 +7,7 @@ from settings.groups import SettingGroup, ModelConfig, SettingDotDict
 from settings.setting_types import BoolSetting, ChannelSetting
 from core.setting_types import MessageSetting
 from babel.translator import LocalBabel
-from utils.lib import recurse_map, replace_multiple, tabulate
+from utils.lib import recurse_map, tabulate
 
 from .data import AlertsData
 
@@ -16,11 +16,39 @@ babel = LocalBabel('streamalerts')
 _p = babel._p
 
 
+def placeholder_field(subkey_desc: dict[str, str]) -> tuple[str, str]:
+    """
+    Build the "Placeholders" description table field for the given placeholder descriptions.
+    """
+    keytable = tabulate(*subkey_desc.items(), colon='')
+    expline = (
+        "The following placeholders will be substituted with their values."
+    )
+    return (
+        "Placeholders",
+        expline + '\n' + '\n'.join(f"> {line}" for line in keytable)
+    )
+
+
 class AlertConfig(ModelConfig):
     settings = SettingDotDict()
     _model_settings = set()
     model = AlertsData.AlertChannel
 
+    @classmethod
+    async def write_many(cls, *settings):
+        """
+        Write several modified settings of the same alert in a single row update.
+        """
+        if not settings:
+            return
+        parent_id = settings[0].parent_id
+        if any(setting.parent_id != parent_id for setting in settings):
+            raise ValueError("Cannot batch write settings for different alerts.")
+        await cls.model.table.update_where(subscriptionid=parent_id).set(
+            **{setting._column: setting.data for setting in settings}
+        ).with_adapter(cls.model._make_rows)
+
 
 class AlertSettings(SettingGroup):
     @AlertConfig.register_model_setting
@@ -37,7 +65,7 @@ class AlertSettings(SettingGroup):
             'Message sent to the attached channel when the Twitch streamer goes live.'
         )
         _accepts = _p('', 'JSON formatted greeting message data')
-        _default = json.dumps({'content': "**{display_name}** just went live at {channel_link}"})
+        _default = '{"content": "**{display_name}** just went live at {channel_link}"}'
 
         _model = AlertsData.AlertChannel
         _column = AlertsData.AlertChannel.live_message.name
@@ -51,6 +79,9 @@ class AlertSettings(SettingGroup):
             '{title}': "Title of the stream when it went live",
             '{game}': "Game name of the stream when it went live"
         }
+        # One group per placeholder, in _subkey_desc order
+        _subkey_pattern = re.compile('|'.join(f"({re.escape(key)})" for key in _subkey_desc))
+        _keyfield = placeholder_field(_subkey_desc)
         # TODO: More stuff
 
         @property
@@ -73,14 +104,20 @@ class AlertSettings(SettingGroup):
                     '{display_name}': streamer.display_name,
                     '{login_name}': streamer.login_name,
                     '{channel_link}': f"https://www.twitch.tv/{streamer.login_name}",
-                    '{stream_start}': int(stream.start_at.timestamp()),
+                    '{stream_start}': str(int(stream.start_at.timestamp())),
                     '{stream_start_iso}': stream.start_at.isoformat(),
-                    '{title}': stream.title,
-                    '{game}': stream.game_name,
+                    '{title}': str(stream.title),
+                    '{game}': str(stream.game_name),
                 }
+                # Placeholder values, indexed by _subkey_pattern group
+                values = tuple(mapping[key] for key in cls._subkey_desc)
 
+                # Substitute every placeholder in a single pass over each string
+                # Note str.format_map is unsuitable, as user messages may contain literal braces
+                sub = cls._subkey_pattern.sub
+                repl = lambda match: values[match.lastindex - 1]
                 return recurse_map(
-                    lambda loc, value: replace_multiple(value, mapping) if isinstance(value, str) else value,
+                    lambda loc, value: (sub(repl, value) if '{' in value else value) if isinstance(value, str) else value,
                     data_dict,
                 )
             return formatter
@@ -91,15 +128,7 @@ class AlertSettings(SettingGroup):
 
         def _desc_table(self, show_value: Optional[str] = None) -> list[tuple[str, str]]:
             lines = super()._desc_table(show_value=show_value)
-            keytable = tabulate(*self._subkey_desc.items(), colon='')
-            expline = (
-                "The following placeholders will be substituted with their values."
-            )
-            keyfield = (
-                "Placeholders",
-                expline + '\n' + '\n'.join(f"> {line}" for line in keytable)
-            )
-            lines.append(keyfield)
+            lines.append(self._keyfield)
             return lines
 
     @AlertConfig.register_model_setting
@@ -138,6 +167,9 @@ class AlertSettings(SettingGroup):
             '{title}': "Title of the stream when it went live",
             '{game}': "Game name of the stream when it went live",
         }
+        # One group per placeholder, in _subkey_desc order
+        _subkey_pattern = re.compile('|'.join(f"({re.escape(key)})" for key in _subkey_desc))
+        _keyfield = placeholder_field(_subkey_desc)
 
         @property
         def update_message(self) -> str:
@@ -163,16 +195,22 @@ class AlertSettings(SettingGroup):
                     '{display_name}': streamer.display_name,
                     '{login_name}': streamer.login_name,
                     '{channel_link}': f"https://www.twitch.tv/{streamer.login_name}",
-                    '{stream_start}': int(stream.start_at.timestamp()),
-                    '{stream_end}': int(stream.end_at.timestamp()),
+                    '{stream_start}': str(int(stream.start_at.timestamp())),
                     '{stream_start_iso}': stream.start_at.isoformat(),
+                    '{stream_end}': str(int(stream.end_at.timestamp())),
                     '{stream_end_iso}': stream.end_at.isoformat(),
-                    '{title}': stream.title,
-                    '{game}': stream.game_name,
+                    '{title}': str(stream.title),
+                    '{game}': str(stream.game_name),
                 }
+                # Placeholder values, indexed by _subkey_pattern group
+                values = tuple(mapping[key] for key in cls._subkey_desc)
 
+                # Substitute every placeholder in a single pass over each string
+                # Note str.format_map is unsuitable, as user messages may contain literal braces
+                sub = cls._subkey_pattern.sub
+                repl = lambda match: values[match.lastindex - 1]
                 return recurse_map(
-                    lambda loc, value: replace_multiple(value, mapping) if isinstance(value, str) else value,
+                    lambda loc, value: (sub(repl, value) if '{' in value else value) if isinstance(value, str) else value,
                     data_dict,
                 )
             return formatter
@@ -183,15 +221,7 @@ class AlertSettings(SettingGroup):
 
         def _desc_table(self, show_value: Optional[str] = None) -> list[tuple[str, str]]:
             lines = super()._desc_table(show_value=show_value)
-            keytable = tabulate(*self._subkey_desc.items(), colon='')
-            expline = (
-                "The following placeholders will be substituted with their values."
-            )
-            keyfield = (
-                "Placeholders",
-                expline + '\n' + '\n'.join(f"> {line}" for line in keytable)
-            )
-            lines.append(keyfield)
+            lines.append(self._keyfield)
             return lines
         ...
 
@@ -274,3 +304,10 @@ class AlertSettings(SettingGroup):
         @property
         def update_message(self):
             return f"This alert will now be posted to {self.value.channel.mention}"
+
+
+# Placeholders supported by the end message in addition to the live message placeholders
+AlertSettings.AlertEndMessage._extra_subkey_items = tuple(
+    (key, desc) for key, desc in AlertSettings.AlertEndMessage._subkey_desc.items()
+    if key not in AlertSettings.AlertMessage._subkey_desc
+)